@@ -79,43 +79,72 @@ function updateStatus(text) {
   statusEl.textContent = text;
 }
 
-let currentAudio = null;
+const WAV_HEADER_BYTES = 44;
 
-function playAudioFromHex(hexString, format = 'wav') {
+let ttsStream = null;
+let ttsSources = [];
+
+function startAudioStream(sampleRate = 22050) {
+  stopAudio();
+  ttsStream = {
+    sampleRate,
+    headerPending: true,
+    nextTime: audioContext.currentTime,
+  };
+}
+
+function playPcmChunk(buffer) {
+  if (!ttsStream) return;
+  let bytes = buffer;
+  if (ttsStream.headerPending) {
+    // First binary frame is the streaming RIFF header
+    ttsStream.headerPending = false;
+    bytes = buffer.slice(WAV_HEADER_BYTES);
+    if (bytes.byteLength === 0) return;
+  }
   try {
-    // Stop any currently playing audio
-    if (currentAudio) {
-      currentAudio.pause();
-      currentAudio = null;
+    const samples = new Int16Array(bytes, 0, bytes.byteLength >> 1);
+    const audioBuffer = audioContext.createBuffer(1, samples.length, ttsStream.sampleRate);
+    const channel = audioBuffer.getChannelData(0);
+    for (let i = 0; i < samples.length; i++) {
+      channel[i] = samples[i] / 32768;
     }
-    
-    // Convert hex string to bytes
-    const bytes = new Uint8Array(hexString.match(/.{1,2}/g).map(byte => parseInt(byte, 16)));
-    const mimeType = format === 'mp3' ? 'audio/mpeg' : 'audio/wav';
-    const blob = new Blob([bytes], { type: mimeType });
-    const url = URL.createObjectURL(blob);
-    
-    currentAudio = new Audio(url);
-    currentAudio.onplay = () => { speaking = true; };
-    currentAudio.onended = () => {
-      speaking = false;
-      URL.revokeObjectURL(url);
-      currentAudio = null;
-    };
-    currentAudio.onerror = (e) => {
-      console.error("Audio playback error:", e);
-      speaking = false;
-      URL.revokeObjectURL(url);
-      currentAudio = null;
+    const source = audioContext.createBufferSource();
+    source.buffer = audioBuffer;
+    source.connect(audioContext.destination);
+    source.onended = () => {
+      ttsSources = ttsSources.filter((s) => s !== source);
+      if (ttsSources.length === 0 && !ttsStream) speaking = false;
     };
-    
-    currentAudio.play().catch(err => console.error("Play failed:", err));
+    const startAt = Math.max(ttsStream.nextTime, audioContext.currentTime);
+    source.start(startAt);
+    ttsStream.nextTime = startAt + audioBuffer.duration;
+    ttsSources.push(source);
+    speaking = true;
   } catch (err) {
     console.error("Failed to play audio:", err);
-    speaking = false;
   }
 }
 
+function endAudioStream() {
+  ttsStream = null;
+  if (ttsSources.length === 0) speaking = false;
+}
+
+function stopAudio() {
+  // Stop any currently playing audio
+  for (const source of ttsSources) {
+    try {
+      source.stop();
+    } catch (err) {
+      // already stopped
+    }
+  }
+  ttsSources = [];
+  ttsStream = null;
+  speaking = false;
+}
+
 function connect() {
   if (ws && ws.readyState === WebSocket.OPEN) return;
   const protocol = location.protocol === "https:" ? "wss" : "ws";
@@ -143,6 +172,11 @@ function connect() {
   };
 
   ws.onmessage = (evt) => {
+    if (evt.data instanceof ArrayBuffer) {
+      // Binary frames carry TTS audio announced by a tts_audio_header message
+      playPcmChunk(evt.data);
+      return;
+    }
     try {
       const payload = JSON.parse(evt.data);
       handleMessage(payload);
@@ -155,11 +189,7 @@ function connect() {
 function sendInterrupt() {
   if (!ws || ws.readyState !== WebSocket.OPEN) return;
   
-  // Stop any playing audio
-  if (currentAudio) {
-    currentAudio.pause();
-    currentAudio = null;
-  }
+  stopAudio();
   
   ws.send(JSON.stringify({ type: "interrupt" }));
 }
@@ -185,11 +215,13 @@ function handleMessage(msg) {
     const target = currentAgent === "A" ? agentAEl : agentBEl;
     agentBuffers[currentAgent] = msg.text;
     target.textContent = msg.text;
-    // Audio will come in separate tts_audio message
-  } else if (msg.type === "tts_audio") {
-    // Play Piper TTS audio
-    if (msg.audio) {
-      playAudioFromHex(msg.audio, msg.format || 'wav');
+    // Audio will stream after a separate tts_audio_header message
+  } else if (msg.type === "tts_audio_header") {
+    // Piper TTS audio follows as streamed binary frames
+    startAudioStream(msg.sample_rate);
+  } else if (msg.type === "tts_audio_end") {
+    endAudioStream();
+    if (!msg.interrupted) {
       currentAgent = currentAgent === "A" ? "B" : "A";
     }
   } else if (msg.type === "interrupt_ack") {
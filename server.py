@@ -1,16 +1,17 @@
 import asyncio
-import io
 import json
 import logging
 import os
 import struct
-import wave
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, AsyncIterator, Optional
 
 import numpy as np
+import onnxruntime
 import soundfile as sf
 import torch
 import webrtcvad
@@ -20,8 +21,15 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from faster_whisper import WhisperModel
 from piper import PiperVoice
-from transformers import AutoModelForCausalLM, AutoTokenizer, TextIteratorStreamer
-from threading import Thread
+from piper.config import PiperConfig
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    StaticCache,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("clashroom")
@@ -33,8 +41,21 @@ MODELS_DIR.mkdir(exist_ok=True)
 
 # Configuration
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny.en")
-LLM_MODEL = os.getenv("LLM_MODEL", "Qwen/Qwen2.5-3B-Instruct")
+# AWQ kernels are GPU-only, so CPU falls back to the unquantized checkpoint
+LLM_MODEL = os.getenv("LLM_MODEL") or (
+    "Qwen/Qwen2.5-3B-Instruct-AWQ" if torch.cuda.is_available() else "Qwen/Qwen2.5-3B-Instruct"
+)
 PIPER_VOICE = os.getenv("PIPER_VOICE", "en_US-lessac-medium")
+LLM_MAX_CACHE_LEN = int(os.getenv("LLM_MAX_CACHE_LEN", "2048"))
+LLM_MAX_NEW_TOKENS = 150
+LLM_FLUSH_TOKENS = 8  # Send streamed tokens in batches of this many...
+LLM_FLUSH_INTERVAL = 0.03  # ...or after this many seconds, whichever comes first
+AUDIO_QUEUE_MAX = 32  # Client chunks buffered while STT lags (~13 s at 400 ms); oldest dropped beyond this
+SYSTEM_PROMPT = "You are a concise debating agent. Respond in 1-2 short sentences."
+
+# Piper output format (mono 16-bit PCM; sample rate comes from the voice config)
+TTS_CHANNELS = 1
+TTS_SAMPLE_WIDTH = 2
 
 app = FastAPI()
 
@@ -52,6 +73,12 @@ app.mount("/public", StaticFiles(directory=str(PUBLIC_DIR)), name="public")
 _whisper_model: Optional[WhisperModel] = None
 _llm_model: Optional[Any] = None
 _llm_tokenizer: Optional[Any] = None
+_llm_cache: Optional[StaticCache] = None
+# One long-lived generation thread: CUDA graphs recorded by torch.compile are per-thread,
+# and running one turn at a time is also what makes sharing _llm_cache safe
+_llm_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm")
+_prompt_prefix_ids: list[int] = []  # System turn + user header, tokenized once
+_prompt_suffix_ids: list[int] = []  # User turn end + assistant header
 _piper_voice: Optional[PiperVoice] = None
 
 
@@ -62,22 +89,50 @@ def get_whisper_model() -> WhisperModel:
         _whisper_model = WhisperModel(
             WHISPER_MODEL,
             device="cuda" if torch.cuda.is_available() else "cpu",
-            compute_type="float16" if torch.cuda.is_available() else "int8"
+            compute_type="int8_float16" if torch.cuda.is_available() else "int8",
+            cpu_threads=max(1, (os.cpu_count() or 2) // 2),
+            num_workers=2,  # Lets concurrent sessions transcribe in parallel
         )
     return _whisper_model
 
 
+def _split_chat_template(tokenizer: Any) -> tuple[list[int], list[int]]:
+    """Pre-tokenize the static chat template around the user message"""
+    sentinel = "\x00USER\x00"
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": sentinel}
+    ]
+    text = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    prefix, suffix = text.split(sentinel)
+    return (
+        tokenizer(prefix, add_special_tokens=False).input_ids,
+        tokenizer(suffix, add_special_tokens=False).input_ids,
+    )
+
+
 def get_llm_model():
-    global _llm_model, _llm_tokenizer
+    global _llm_model, _llm_tokenizer, _llm_cache, _prompt_prefix_ids, _prompt_suffix_ids
     if _llm_model is None or _llm_tokenizer is None:
         logger.info(f"Loading LLM model: {LLM_MODEL}")
         _llm_tokenizer = AutoTokenizer.from_pretrained(LLM_MODEL)
+        _prompt_prefix_ids, _prompt_suffix_ids = _split_chat_template(_llm_tokenizer)
         _llm_model = AutoModelForCausalLM.from_pretrained(
             LLM_MODEL,
             torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
             device_map="auto",
-            load_in_4bit=True if torch.cuda.is_available() else False,
+            attn_implementation="sdpa",
         )
+        # Preallocated KV cache reused across turns; fixed shapes also let the compiled decode step be reused
+        _llm_cache = StaticCache(
+            config=_llm_model.config,
+            batch_size=1,
+            max_cache_len=LLM_MAX_CACHE_LEN,
+            device=_llm_model.device,
+            dtype=_llm_model.dtype,
+        )
+        if torch.cuda.is_available():
+            _llm_model.forward = torch.compile(_llm_model.forward, mode="reduce-overhead", fullgraph=False)
     return _llm_model, _llm_tokenizer
 
 
@@ -89,10 +144,42 @@ def get_piper_voice() -> PiperVoice:
         if not voice_path.exists():
             logger.warning(f"Piper voice not found at {voice_path}, downloading...")
             # In production, download from Piper voices repo
-        _piper_voice = PiperVoice.load(str(voice_path))
+        
+        sess_options = onnxruntime.SessionOptions()
+        sess_options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+        sess_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        
+        providers = ["CPUExecutionProvider"]
+        if torch.cuda.is_available() and "CUDAExecutionProvider" in onnxruntime.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+        
+        # PiperVoice.load() does not expose session options, so build the voice directly
+        with open(f"{voice_path}.json", "r", encoding="utf-8") as config_file:
+            config = PiperConfig.from_dict(json.load(config_file))
+        _piper_voice = PiperVoice(
+            config=config,
+            session=onnxruntime.InferenceSession(
+                str(voice_path),
+                sess_options=sess_options,
+                providers=providers,
+            ),
+        )
     return _piper_voice
 
 
+@lru_cache(maxsize=None)
+def streaming_wav_header(sample_rate: int) -> bytes:
+    """44-byte WAV header with RIFF and data sizes set to 0xFFFFFFFF (length unknown up front)"""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, 1, TTS_CHANNELS, sample_rate,
+        sample_rate * TTS_CHANNELS * TTS_SAMPLE_WIDTH,
+        TTS_CHANNELS * TTS_SAMPLE_WIDTH, TTS_SAMPLE_WIDTH * 8,
+        b"data", 0xFFFFFFFF,
+    )
+
+
 @app.get("/")
 def index() -> FileResponse:
     return FileResponse(PUBLIC_DIR / "index.html")
@@ -104,48 +191,105 @@ class AudioProcessor:
         self.sample_rate = 16000
         self.frame_duration_ms = 30
         self.frame_size = int(self.sample_rate * self.frame_duration_ms / 1000)
-        self.buffer = bytearray()
+        self.frame_bytes = self.frame_size * 2  # 16-bit samples
+        self.end_silence_frames = 10  # 300 ms of trailing silence ends an utterance
+        self.preroll_frames = 10  # Silence kept ahead of speech onset
+        self.min_speech_frames = 8  # 240 ms of speech, shorter blips are dropped as noise
+        self.max_utterance_bytes = 30 * self.sample_rate * 2  # Whisper's 30 s window
+        # Reusable float32 staging buffer for Whisper input, one utterance long
+        self.float_buffer = np.empty(self.max_utterance_bytes // 2, dtype=np.float32)
+        self.buffer = bytearray()  # Unprocessed audio; frames after a finished utterance wait for the next call
+        self.utterance = bytearray()
+        self._silence_frames = 0
+        self._speech_frames = 0
+        self._speech_seen = False
+    
+    def reset(self) -> None:
+        self.buffer.clear()
+        self.utterance.clear()
+        self._silence_frames = 0
+        self._speech_frames = 0
+        self._speech_seen = False
         
-    def add_audio(self, audio_bytes: bytes) -> Optional[bytes]:
+    def add_audio(self, audio_bytes: bytes) -> Optional[bytearray]:
         """Add audio and return complete utterance when silence detected"""
         self.buffer.extend(audio_bytes)
         
-        # Process in frames
-        if len(self.buffer) < self.frame_size * 2:
-            return None
-            
-        # Simple VAD: check if we have speech
-        frame = bytes(self.buffer[:self.frame_size * 2])
-        try:
-            is_speech = self.vad.is_speech(frame, self.sample_rate)
-            if not is_speech and len(self.buffer) > self.sample_rate * 2:  # 1 sec of audio
-                result = bytes(self.buffer)
-                self.buffer.clear()
-                return result
-        except Exception as e:
-            logger.error(f"VAD error: {e}")
+        result = None
+        offset = 0
+        with memoryview(self.buffer) as view:
+            # VAD each new frame in order, tracking trailing silence
+            while len(self.buffer) - offset >= self.frame_bytes:
+                with view[offset:offset + self.frame_bytes] as frame:
+                    offset += self.frame_bytes
+                    try:
+                        is_speech = self.vad.is_speech(bytes(frame), self.sample_rate)
+                    except Exception as e:
+                        logger.error(f"VAD error: {e}")
+                        continue
+                    self.utterance.extend(frame)
+                
+                preroll_bytes = self.preroll_frames * self.frame_bytes
+                if is_speech:
+                    self._speech_seen = True
+                    self._speech_frames += 1
+                    self._silence_frames = 0
+                elif self._speech_seen:
+                    self._silence_frames += 1
+                elif len(self.utterance) > preroll_bytes:
+                    del self.utterance[:-preroll_bytes]
+                
+                if self._speech_seen and (
+                    self._silence_frames >= self.end_silence_frames
+                    or len(self.utterance) >= self.max_utterance_bytes
+                ):
+                    if self._speech_frames >= self.min_speech_frames:
+                        # Hand the buffer over instead of copying the whole utterance
+                        result = self.utterance
+                        self.utterance = bytearray()
+                    else:
+                        # Too little speech for Whisper, which hallucinates on near-silence
+                        del self.utterance[:-preroll_bytes]
+                    self._silence_frames = 0
+                    self._speech_frames = 0
+                    self._speech_seen = False
+                    if result is not None:
+                        break
         
-        return None
+        del self.buffer[:offset]
+        return result
+
+
+def _transcribe_sync(model: WhisperModel, audio_np: np.ndarray) -> str:
+    """Run Whisper and drain its lazy segment generator (blocking)"""
+    segments, info = model.transcribe(
+        audio_np,
+        beam_size=1,
+        language="en",
+        condition_on_previous_text=False,
+    )
+    return " ".join(segment.text for segment in segments).strip()
 
 
-async def transcribe_audio(audio_data: bytes) -> Optional[str]:
-    """Transcribe audio using faster-whisper"""
+async def transcribe_audio(
+    audio_data: bytes | bytearray,
+    out: Optional[np.ndarray] = None
+) -> Optional[str]:
+    """Transcribe audio using faster-whisper, staging samples in `out` when it fits"""
     try:
         model = get_whisper_model()
         
-        # Convert bytes to numpy array
-        audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+        # Convert int16 bytes to float32 in [-1, 1)
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        if out is not None and len(out) >= len(samples):
+            audio_np = out[:len(samples)]
+            np.multiply(samples, np.float32(1.0 / 32768.0), out=audio_np)
+        else:
+            audio_np = samples.astype(np.float32)
+            np.multiply(audio_np, np.float32(1.0 / 32768.0), out=audio_np)
         
-        # Transcribe
-        segments, info = model.transcribe(
-            audio_np,
-            beam_size=1,
-            language="en",
-            condition_on_previous_text=False,
-            vad_filter=True,
-        )
-        
-        text = " ".join(segment.text for segment in segments).strip()
+        # Transcribe off the event loop; segments decode lazily, so join there too
+        text = await asyncio.to_thread(_transcribe_sync, model, audio_np)
         return text if text else None
     
     except Exception as e:
@@ -153,6 +297,37 @@ async def transcribe_audio(audio_data: bytes) -> Optional[str]:
         return None
 
 
+class InterruptCriteria(StoppingCriteria):
+    """Stop generation as soon as the turn is interrupted"""
+    def __init__(self, interrupt_event: asyncio.Event):
+        self.interrupt_event = interrupt_event
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
+        return self.interrupt_event.is_set()
+
+
+def _run_generate(model: Any, generation_kwargs: dict, interrupt_event: asyncio.Event) -> None:
+    """Run generate() on the LLM worker thread against the shared static KV cache (blocking)"""
+    try:
+        # A turn interrupted while queued behind another session skips prefill entirely
+        if not interrupt_event.is_set():
+            _llm_cache.reset()
+            model.generate(**generation_kwargs, past_key_values=_llm_cache)
+    except Exception as e:
+        logger.exception(f"LLM generation thread error: {e}")
+    finally:
+        # Unblock the consumer even if generate() raised before finishing the stream
+        generation_kwargs["streamer"].end()
+
+
+def _warmup_llm() -> None:
+    """Compile and record the decode graphs on the LLM worker before the first turn"""
+    model, tokenizer = get_llm_model()
+    inputs = tokenizer(["Hello"], return_tensors="pt").to(model.device)
+    _llm_cache.reset()
+    model.generate(**inputs, max_new_tokens=8, do_sample=False, past_key_values=_llm_cache)
+
+
 async def generate_llm_response(
     prompt: str,
     interrupt_event: asyncio.Event
@@ -161,69 +336,89 @@ async def generate_llm_response(
     try:
         model, tokenizer = get_llm_model()
         
-        messages = [
-            {"role": "system", "content": "You are a concise debating agent. Respond in 1-2 short sentences."},
-            {"role": "user", "content": prompt}
-        ]
+        # Only the user text is tokenized per turn; the template around it is cached
+        user_ids = tokenizer(prompt, add_special_tokens=False).input_ids
         
-        text = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
-        inputs = tokenizer([text], return_tensors="pt").to(model.device)
+        # The static cache has a fixed length; writing past it is a device-side assert on CUDA
+        max_user_len = LLM_MAX_CACHE_LEN - LLM_MAX_NEW_TOKENS - len(_prompt_prefix_ids) - len(_prompt_suffix_ids)
+        if len(user_ids) > max_user_len:
+            logger.warning(f"Prompt truncated from {len(user_ids)} to {max_user_len} tokens")
+            user_ids = user_ids[:max(0, max_user_len)]
+        
+        input_ids = torch.tensor(
+            [_prompt_prefix_ids + user_ids + _prompt_suffix_ids],
+            device=model.device
+        )
         
         streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
         
         generation_kwargs = dict(
-            inputs,
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
             streamer=streamer,
-            max_new_tokens=150,
+            max_new_tokens=LLM_MAX_NEW_TOKENS,
             do_sample=True,
             temperature=0.7,
             top_p=0.9,
+            stopping_criteria=StoppingCriteriaList([InterruptCriteria(interrupt_event)]),
         )
         
-        thread = Thread(target=model.generate, kwargs=generation_kwargs)
-        thread.start()
+        generation = asyncio.get_running_loop().run_in_executor(
+            _llm_executor, _run_generate, model, generation_kwargs, interrupt_event
+        )
         
-        for text in streamer:
-            if interrupt_event.is_set():
+        # Pull tokens off the event loop: a turn queued behind another session would otherwise freeze every socket
+        while True:
+            text = await asyncio.to_thread(next, streamer, None)
+            if text is None or interrupt_event.is_set():
                 break
             yield text
         
-        thread.join()
+        await generation
     
     except Exception as e:
         logger.error(f"LLM generation error: {e}")
         yield f"Error: {str(e)}"
 
 
-async def synthesize_speech(text: str) -> Optional[bytes]:
-    """Synthesize speech using Piper TTS"""
+async def stream_synthesized_speech(
+    text: str,
+    websocket: WebSocket,
+    interrupt_event: Optional[asyncio.Event] = None
+) -> bool:
+    """Stream Piper TTS audio to the client as it is synthesized"""
     try:
         voice = get_piper_voice()
+        chunks = iter(voice.synthesize_stream_raw(text))
         
-        # Generate audio
-        audio_chunks = []
-        for audio_bytes in voice.synthesize_stream_raw(text):
-            audio_chunks.append(audio_bytes)
+        # Synthesize the first chunk before announcing the stream
+        pcm = await asyncio.to_thread(next, chunks, None)
+        if pcm is None:
+            return False
         
-        if not audio_chunks:
-            return None
-            
-        # Combine and convert to WAV
-        audio_data = b"".join(audio_chunks)
+        sample_rate = voice.config.sample_rate
+        await websocket.send_json({
+            "type": "tts_audio_header",
+            "format": "wav",
+            "sample_rate": sample_rate,
+            "streaming": True
+        })
+        await websocket.send_bytes(streaming_wav_header(sample_rate))
         
-        # Create WAV file in memory
-        wav_io = io.BytesIO()
-        with wave.open(wav_io, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(22050)
-            wav_file.writeframes(audio_data)
+        interrupted = False
+        while pcm is not None:
+            if interrupt_event and interrupt_event.is_set():
+                interrupted = True
+                break
+            await websocket.send_bytes(pcm)
+            pcm = await asyncio.to_thread(next, chunks, None)
         
-        return wav_io.getvalue()
+        await websocket.send_json({"type": "tts_audio_end", "interrupted": interrupted})
+        return not interrupted
     
     except Exception as e:
         logger.error(f"TTS error: {e}")
-        return None
+        return False
 
 
 @app.websocket("/ws")
@@ -232,10 +427,18 @@ async def websocket_handler(websocket: WebSocket) -> None:
     await websocket.send_json({"type": "ready"})
     
     processor = AudioProcessor()
+    audio_queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=AUDIO_QUEUE_MAX)
+    audio_task: Optional[asyncio.Task] = None
+    prompt_tasks: set[asyncio.Task] = set()
     llm_interrupt: Optional[asyncio.Event] = None
     llm_task: Optional[asyncio.Task] = None
+    pipeline_lock = asyncio.Lock()  # Audio and control paths can both start a turn
     
     async def run_llm_pipeline(transcript: str) -> None:
+        async with pipeline_lock:
+            await _start_llm_pipeline(transcript)
+    
+    async def _start_llm_pipeline(transcript: str) -> None:
         nonlocal llm_interrupt, llm_task
         
         if llm_task and not llm_task.done():
@@ -250,23 +453,27 @@ async def websocket_handler(websocket: WebSocket) -> None:
         async def _worker() -> None:
             nonlocal llm_interrupt
             try:
+                loop = asyncio.get_running_loop()
                 full_text = []
+                pending = []
+                last_flush = loop.time()
                 async for token in generate_llm_response(transcript, llm_interrupt):
                     full_text.append(token)
-                    await websocket.send_json({"type": "llm", "text": token})
+                    pending.append(token)
+                    if len(pending) >= LLM_FLUSH_TOKENS or loop.time() - last_flush > LLM_FLUSH_INTERVAL:
+                        await websocket.send_json({"type": "llm", "text": "".join(pending)})
+                        pending.clear()
+                        last_flush = loop.time()
+                
+                if pending and not llm_interrupt.is_set():
+                    await websocket.send_json({"type": "llm", "text": "".join(pending)})
                 
                 if full_text and not llm_interrupt.is_set():
                     complete_text = "".join(full_text)
                     await websocket.send_json({"type": "llm_final", "text": complete_text})
                     
-                    # Generate speech
-                    audio_data = await synthesize_speech(complete_text)
-                    if audio_data:
-                        await websocket.send_json({
-                            "type": "tts_audio",
-                            "audio": audio_data.hex(),
-                            "format": "wav"
-                        })
+                    # Stream speech
+                    await stream_synthesized_speech(complete_text, websocket, llm_interrupt)
             
             except asyncio.CancelledError:
                 raise
@@ -280,20 +487,15 @@ async def websocket_handler(websocket: WebSocket) -> None:
         
         llm_task = asyncio.create_task(_worker())
     
-    try:
+    async def audio_loop() -> None:
+        """Consume audio frames so transcription never delays control messages"""
         while True:
-            message = await websocket.receive()
-            
-            if message.get("type") == "websocket.disconnect":
-                break
-            
-            if message.get("bytes"):
-                audio_chunk = message["bytes"]
-                
-                # Process audio
+            audio_chunk = await audio_queue.get()
+            try:
                 complete_audio = processor.add_audio(audio_chunk)
                 if complete_audio:
-                    transcript = await transcribe_audio(complete_audio)
+                    # Safe to reuse: this loop awaits each transcription before the next chunk
+                    transcript = await transcribe_audio(complete_audio, processor.float_buffer)
                     if transcript:
                         await websocket.send_json({
                             "type": "stt",
@@ -301,8 +503,33 @@ async def websocket_handler(websocket: WebSocket) -> None:
                             "final": True
                         })
                         await run_llm_pipeline(transcript)
+            except Exception as e:
+                logger.exception(f"Audio pipeline error: {e}")
+    
+    async def prompt_turn(text: str) -> None:
+        """Start a typed-prompt turn without holding up the reader"""
+        try:
+            await run_llm_pipeline(text)
+        except Exception as e:
+            logger.exception(f"Prompt pipeline error: {e}")
+    
+    try:
+        audio_task = asyncio.create_task(audio_loop())
+        
+        # Single reader: Starlette cannot serve concurrent receive() calls on one socket
+        while True:
+            message = await websocket.receive()
+            
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            audio_chunk = message.get("bytes")
+            if audio_chunk:
+                if audio_queue.full():
+                    audio_queue.get_nowait()
+                audio_queue.put_nowait(audio_chunk)
             
-            elif "text" in message and message["text"]:
+            elif message.get("text"):
                 try:
                     data = json.loads(message["text"])
                 except json.JSONDecodeError:
@@ -314,13 +541,19 @@ async def websocket_handler(websocket: WebSocket) -> None:
                     if llm_interrupt and not llm_interrupt.is_set():
                         llm_interrupt.set()
                         await websocket.send_json({"type": "interrupt_ack"})
-                    processor.buffer.clear()
+                    # Drop audio received before the interrupt along with the partial utterance
+                    while not audio_queue.empty():
+                        audio_queue.get_nowait()
+                    processor.reset()
                 
                 elif kind == "prompt":
                     text = (data.get("text") or "").strip()
                     if text:
                         await websocket.send_json({"type": "stt", "text": text, "final": True})
-                        await run_llm_pipeline(text)
+                        # Starting a turn waits on the previous one, so keep it off the reader
+                        task = asyncio.create_task(prompt_turn(text))
+                        prompt_tasks.add(task)
+                        task.add_done_callback(prompt_tasks.discard)
                 
                 elif kind == "ping":
                     await websocket.send_json({"type": "pong", "id": data.get("id")})
@@ -330,6 +563,11 @@ async def websocket_handler(websocket: WebSocket) -> None:
     except Exception as e:
         logger.exception(f"WebSocket error: {e}")
     finally:
+        for task in [audio_task, *prompt_tasks]:
+            if task:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
         if llm_task and not llm_task.done():
             if llm_interrupt:
                 llm_interrupt.set()
@@ -345,5 +583,12 @@ async def startup_event():
     # Preload models
     get_whisper_model()
     get_llm_model()
-    # Piper voice loads on first use
+    if torch.cuda.is_available():
+        # Pay torch.compile and CUDA graph capture here rather than on the first user turn
+        await asyncio.get_running_loop().run_in_executor(_llm_executor, _warmup_llm)
+    try:
+        get_piper_voice()
+    except Exception as e:
+        # TTS fails per request until the voice is installed; STT and LLM still work
+        logger.error(f"Piper voice failed to load, TTS disabled: {e}")
     logger.info("Models loaded successfully")